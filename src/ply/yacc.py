@@ -236,6 +236,15 @@ class LRParser:
     def errok(self):
         self.errorok = True
 
+    # Pickling support.  Only the parsing tables and grammar rules need to be
+    # saved.  State left over from the last call to parse() (the parsing stacks
+    # and the token() method of the lexer that was used) is dropped.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('statestack', 'symstack', 'state', 'token'):
+            state.pop(name, None)
+        return state
+
     def restart(self):
         del self.statestack[:]
         del self.symstack[:]
@@ -616,6 +625,7 @@ _is_identifier = re.compile(r'^[a-zA-Z0-9_-]+$')
 
 class Production(object):
     reduced = 0
+    lr0_added = 0
     def __init__(self, number, name, prod, precedence=('right', 0), func=None, file='', line=0):
         self.name     = name
         self.prod     = tuple(prod)
@@ -768,7 +778,7 @@ class Grammar(object):
                                     # list of the rules where they are used.
 
         for term in terminals:
-            self.Terminals[term] = []
+            self.Terminals[sys.intern(term)] = []
 
         self.Terminals['error'] = []
 
@@ -830,6 +840,12 @@ class Grammar(object):
 
     def add_production(self, prodname, syms, func=None, file='', line=0):
 
+        # Rule names and symbols come from splitting docstrings.  Intern them so
+        # that the many dictionary lookups done while building the tables compare
+        # identical string objects.
+        prodname = sys.intern(prodname)
+        syms[:] = [sys.intern(s) for s in syms]
+
         if prodname in self.Terminals:
             raise GrammarError('%s:%d: Illegal rule name %r. Already defined as a token' % (file, line, prodname))
         if prodname == 'error':
@@ -970,6 +986,9 @@ class Grammar(object):
         while True:
             some_change = False
             for (n, pl) in self.Prodnames.items():
+                # Nothing more to learn about a nonterminal already known to terminate.
+                if terminates[n]:
+                    continue
                 # Nonterminal n terminates iff any of its productions terminates.
                 for p in pl:
                     # Production p terminates iff all of its rhs symbols terminate.
@@ -987,9 +1006,8 @@ class Grammar(object):
 
                     if p_terminates:
                         # symbol n terminates!
-                        if not terminates[n]:
-                            terminates[n] = True
-                            some_change = True
+                        terminates[n] = True
+                        some_change = True
                         # Don't need to consider any more productions for this n.
                         break
 
@@ -1127,18 +1145,40 @@ class Grammar(object):
 
         # Nonterminals:
 
-        # Initialize to the empty set:
+        # Initialize to the empty set.  The lists in First keep the order in
+        # which symbols were found; firstsets holds the same symbols for fast
+        # membership tests.
+        firstsets = {}
         for n in self.Nonterminals:
             self.First[n] = []
+            firstsets[n] = set()
 
-        # Then propagate symbols until no change:
+        # Then propagate symbols until no change.  This is _first() applied to
+        # each production, merging straight into First[n] rather than building
+        # an intermediate list.
+        First = self.First
         while True:
             some_change = False
             for n in self.Nonterminals:
+                first_n = First[n]
+                firstset_n = firstsets[n]
                 for p in self.Prodnames[n]:
-                    for f in self._first(p.prod):
-                        if f not in self.First[n]:
-                            self.First[n].append(f)
+                    for x in p.prod:
+                        x_produces_empty = False
+                        for f in First[x]:
+                            if f == '<empty>':
+                                x_produces_empty = True
+                            elif f not in firstset_n:
+                                firstset_n.add(f)
+                                first_n.append(f)
+                                some_change = True
+                        if not x_produces_empty:
+                            break
+                    else:
+                        # Every symbol of p (possibly none) produces empty
+                        if '<empty>' not in firstset_n:
+                            firstset_n.add('<empty>')
+                            first_n.append('<empty>')
                             some_change = True
             if not some_change:
                 break
@@ -1162,35 +1202,49 @@ class Grammar(object):
             self.compute_first()
 
         # Add '$end' to the follow list of the start symbol
+        followsets = {}
         for k in self.Nonterminals:
             self.Follow[k] = []
+            followsets[k] = set()
 
         if not start:
             start = self.Productions[1].name
 
         self.Follow[start] = ['$end']
+        followsets[start] = {'$end'}
+
+        # The FIRST set of what follows each nonterminal in a production doesn't
+        # change from one pass to the next, so work it out once.  Each entry is
+        # (B, fst, name) where fst is FIRST of the symbols after B and name is
+        # the production name if FOLLOW(name) must also be added to FOLLOW(B).
+        rules = []
+        for p in self.Productions[1:]:
+            # Here is the production set
+            for i, B in enumerate(p.prod):
+                if B in self.Nonterminals:
+                    # Okay. We got a non-terminal in a production
+                    fst = self._first(p.prod[i+1:])
+                    hasempty = '<empty>' in fst
+                    fst = [f for f in fst if f != '<empty>']
+                    rules.append((B, fst, p.name if hasempty or i == (len(p.prod)-1) else None))
 
         while True:
             didadd = False
-            for p in self.Productions[1:]:
-                # Here is the production set
-                for i, B in enumerate(p.prod):
-                    if B in self.Nonterminals:
-                        # Okay. We got a non-terminal in a production
-                        fst = self._first(p.prod[i+1:])
-                        hasempty = False
-                        for f in fst:
-                            if f != '<empty>' and f not in self.Follow[B]:
-                                self.Follow[B].append(f)
-                                didadd = True
-                            if f == '<empty>':
-                                hasempty = True
-                        if hasempty or i == (len(p.prod)-1):
-                            # Add elements of follow(a) to follow(b)
-                            for f in self.Follow[p.name]:
-                                if f not in self.Follow[B]:
-                                    self.Follow[B].append(f)
-                                    didadd = True
+            for B, fst, name in rules:
+                follow_B = self.Follow[B]
+                followset_B = followsets[B]
+                for f in fst:
+                    if f not in followset_B:
+                        followset_B.add(f)
+                        follow_B.append(f)
+                        didadd = True
+                if name is not None:
+                    # Add elements of follow(a) to follow(b)
+                    for f in self.Follow[name]:
+                        if f not in followset_B:
+                            followset_B.add(f)
+                            follow_B.append(f)
+                            didadd = True
             if not didadd:
                 break
         return self.Follow
@@ -1269,32 +1323,39 @@ def digraph(X, R, FP):
         N[x] = 0
     stack = []
     F = {}
+    S = {}                   # Set of the members of each F(x) for fast membership tests
     for x in X:
         if N[x] == 0:
-            traverse(x, N, stack, F, X, R, FP)
+            traverse(x, N, stack, F, S, X, R, FP)
     return F
 
-def traverse(x, N, stack, F, X, R, FP):
+def traverse(x, N, stack, F, S, X, R, FP):
     stack.append(x)
     d = len(stack)
     N[x] = d
     F[x] = FP(x)             # F(X) <- F'(x)
+    S[x] = set(F[x])
 
     rel = R(x)               # Get y's related to x
     for y in rel:
         if N[y] == 0:
-            traverse(y, N, stack, F, X, R, FP)
+            traverse(y, N, stack, F, S, X, R, FP)
         N[x] = min(N[x], N[y])
+        fx = F[x]
+        sx = S[x]
         for a in F.get(y, []):
-            if a not in F[x]:
-                F[x].append(a)
+            if a not in sx:
+                sx.add(a)
+                fx.append(a)
     if N[x] == d:
         N[stack[-1]] = MAXINT
         F[stack[-1]] = F[x]
+        S[stack[-1]] = S[x]
         element = stack.pop()
         while element != x:
             N[stack[-1]] = MAXINT
             F[stack[-1]] = F[x]
+            S[stack[-1]] = S[x]
             element = stack.pop()
 
 class LALRError(YaccError):
@@ -1349,20 +1410,18 @@ class LRTable:
 
     def lr0_closure(self, I):
         self._add_count += 1
+        add_count = self._add_count
 
-        # Add everything in I to J
+        # Add everything in I to J.  Items appended to J are picked up by the
+        # same loop, so a single pass reaches the closure.
         J = I[:]
-        didadd = True
-        while didadd:
-            didadd = False
-            for j in J:
-                for x in j.lr_after:
-                    if getattr(x, 'lr0_added', 0) == self._add_count:
-                        continue
-                    # Add B --> .G to J
-                    J.append(x.lr_next)
-                    x.lr0_added = self._add_count
-                    didadd = True
+        for j in J:
+            for x in j.lr_after:
+                if x.lr0_added == add_count:
+                    continue
+                # Add B --> .G to J
+                J.append(x.lr_next)
+                x.lr0_added = add_count
 
         return J
 
@@ -1495,12 +1554,15 @@ class LRTable:
 
     def find_nonterminal_transitions(self, C):
         trans = []
+        seen = set()
+        Nonterminals = self.grammar.Nonterminals
         for stateno, state in enumerate(C):
             for p in state:
                 if p.lr_index < p.len - 1:
                     t = (stateno, p.prod[p.lr_index+1])
-                    if t[1] in self.grammar.Nonterminals:
-                        if t not in trans:
+                    if t[1] in Nonterminals:
+                        if t not in seen:
+                            seen.add(t)
                             trans.append(t)
         return trans
 
@@ -1701,15 +1763,21 @@ class LRTable:
     # -----------------------------------------------------------------------------
 
     def add_lookaheads(self, lookbacks, followset):
+        added = {}           # Sets of the lookaheads already added to each (state, item)
         for trans, lb in lookbacks.items():
+            f = followset.get(trans, [])
             # Loop over productions in lookback
             for state, p in lb:
                 if state not in p.lookaheads:
                     p.lookaheads[state] = []
-                f = followset.get(trans, [])
+                laheads = p.lookaheads[state]
+                seen = added.get((state, id(p)))
+                if seen is None:
+                    seen = added[(state, id(p))] = set(laheads)
                 for a in f:
-                    if a not in p.lookaheads[state]:
-                        p.lookaheads[state].append(a)
+                    if a not in seen:
+                        seen.add(a)
+                        laheads.append(a)
 
     # -----------------------------------------------------------------------------
     # add_lalr_lookaheads()
@@ -1782,7 +1850,7 @@ class LRTable:
                             # We are at the end of a production.  Reduce!
                             laheads = p.lookaheads[st]
                             for a in laheads:
-                                actlist.append((a, p, 'reduce using rule %d (%s)' % (p.number, p)))
+                                actlist.append((a, p, -p.number))
                                 r = st_action.get(a)
                                 if r is not None:
                                     # Whoa. Have a shift/reduce or reduce/reduce conflict
@@ -1842,7 +1910,7 @@ class LRTable:
                             j = self.lr0_cidhash.get(id(g), -1)
                             if j >= 0:
                                 # We are in a shift state
-                                actlist.append((a, p, 'shift and go to state %d' % j))
+                                actlist.append((a, p, j))
                                 r = st_action.get(a)
                                 if r is not None:
                                     # Whoa have a shift/reduce or shift/shift conflict
@@ -1883,23 +1951,31 @@ class LRTable:
                                     st_action[a] = j
                                     st_actionp[a] = p
 
-            # Print the actions associated with each terminal
+            # Print the actions associated with each terminal.  actlist holds
+            # (terminal, item, act) where act is the target state of a shift or
+            # the negated rule number of a reduce; messages are only formatted here.
             _actprint = {}
-            for a, p, m in actlist:
+            for a, p, act in actlist:
                 if a in st_action:
                     if p is st_actionp[a]:
-                        log.info('    %-15s %s', a, m)
-                        _actprint[(a, m)] = 1
+                        if act >= 0:
+                            log.info('    %-15s shift and go to state %d', a, act)
+                        else:
+                            log.info('    %-15s reduce using rule %d (%s)', a, -act, p)
+                        _actprint[(a, act)] = 1
             log.info('')
             # Print the actions that were not used. (debugging)
             not_used = 0
-            for a, p, m in actlist:
+            for a, p, act in actlist:
                 if a in st_action:
                     if p is not st_actionp[a]:
-                        if not (a, m) in _actprint:
-                            log.debug('  ! %-15s [ %s ]', a, m)
+                        if not (a, act) in _actprint:
+                            if act >= 0:
+                                log.debug('  ! %-15s [ shift and go to state %d ]', a, act)
+                            else:
+                                log.debug('  ! %-15s [ reduce using rule %d (%s) ]', a, -act, p)
                             not_used = 1
-                            _actprint[(a, m)] = 1
+                            _actprint[(a, act)] = 1
             if not_used:
                 log.debug('')
 
@@ -2474,6 +2550,13 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    # The LR items attached to each production (and their per-state lookahead
+    # sets) are only needed to construct the tables.  Drop them so that the
+    # parser doesn't keep them alive or carry them along when pickled.
+    for p in lr.lr_productions:
+        p.lr_items = []
+        p.lr_next = None
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
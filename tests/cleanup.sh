@@ -1,4 +1,3 @@
 #!/bin/sh
 
-rm -rf *~ *.pyc *.pyo *.dif *.out __pycache__
-
+rm -rf *~ *.pyc *.pyo __pycache__
@@ -0,0 +1,50 @@
+# -----------------------------------------------------------------------------
+# lex_pickle.py
+#
+# Make sure a lexer with more than one state survives a round trip through
+# pickle
+# -----------------------------------------------------------------------------
+import pickle
+import ply.lex as lex
+
+tokens = [
+    "PLUS",
+    "MINUS",
+    "NUMBER",
+    ]
+
+states = (('comment', 'exclusive'),)
+
+t_PLUS = r'\+'
+t_MINUS = r'-'
+t_ignore = " \t"
+
+def t_NUMBER(t):
+    r'\d+'
+    t.value = int(t.value)
+    return t
+
+def t_begin_comment(t):
+    r'/\*'
+    t.lexer.begin('comment')
+
+def t_comment_end(t):
+    r'\*/'
+    t.lexer.begin('INITIAL')
+
+def t_comment_body(t):
+    r'[^*]+|\*'
+    pass
+
+t_comment_ignore = ""
+
+def t_comment_error(t):
+    t.lexer.skip(1)
+
+def t_error(t):
+    print("Illegal character '%s'" % t.value[0])
+    t.lexer.skip(1)
+
+lexer = lex.lex()
+lexer = pickle.loads(pickle.dumps(lexer))
+lex.runmain(lexer, data="3 + /* 5 - 2 */ 4")
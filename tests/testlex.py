@@ -1,98 +1,49 @@
 # testlex.py
 
 import unittest
-try:
-    import StringIO
-except ImportError:
-    import io as StringIO
+import io
+import contextlib
 
 import sys
-import os
+import importlib
 import warnings
-import platform
 
 sys.tracebacklimit = 0
 
 import ply.lex
 
-try:
-    from importlib.util import cache_from_source
-except ImportError:
-    # Python 2.7, but we don't care.
-    cache_from_source = None
-
-
-def make_pymodule_path(filename, optimization=None):
-    path = os.path.dirname(filename)
-    file = os.path.basename(filename)
-    mod, ext = os.path.splitext(file)
-
-    if sys.hexversion >= 0x3050000:
-        fullpath = cache_from_source(filename, optimization=optimization)
-    elif sys.hexversion >= 0x3040000:
-        fullpath = cache_from_source(filename, ext=='.pyc')
-    elif sys.hexversion >= 0x3020000:
-        import imp
-        modname = mod+"."+imp.get_tag()+ext
-        fullpath = os.path.join(path,'__pycache__',modname)
-    else:
-        fullpath = filename
-    return fullpath
-
-def pymodule_out_exists(filename, optimization=None):
-    return os.path.exists(make_pymodule_path(filename,
-                                             optimization=optimization))
-
-def pymodule_out_remove(filename, optimization=None):
-    os.remove(make_pymodule_path(filename, optimization=optimization))
-
-def implementation():
-    if platform.system().startswith("Java"):
-        return "Jython"
-    elif hasattr(sys, "pypy_version_info"):
-        return "PyPy"
-    else:
-        return "CPython"
-
-test_pyo = (implementation() == 'CPython')
-
 def check_expected(result, expected, contains=False):
-    if sys.version_info[0] >= 3:
-        if isinstance(result,str):
-            result = result.encode('ascii')
-        if isinstance(expected,str):
-            expected = expected.encode('ascii')
     resultlines = result.splitlines()
     expectedlines = expected.splitlines()
 
     if len(resultlines) != len(expectedlines):
         return False
 
-    for rline,eline in zip(resultlines,expectedlines):
-        if contains:
-            if eline not in rline:
-                return False
-        else:
-            if not rline.endswith(eline):
-                return False
-    return True
+    if contains:
+        return all(eline in rline for rline, eline in zip(resultlines, expectedlines))
+    else:
+        return all(rline.endswith(eline) for rline, eline in zip(resultlines, expectedlines))
 
 def run_import(module):
-    code = "import "+module
-    exec(code)
-    del sys.modules[module]
+    try:
+        importlib.import_module(module)
+    finally:
+        sys.modules.pop(module, None)
     
+# Redirect sys.stdout and sys.stderr to fresh buffers for the duration of
+# a test.  The previous streams are restored when the test finishes.
+def capture_output(testcase):
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    testcase.addCleanup(stack.close)
+
 # Tests related to errors and warnings when building lexers
 class LexErrorWarningTests(unittest.TestCase):
     def setUp(self):
-        sys.stderr = StringIO.StringIO()
-        sys.stdout = StringIO.StringIO()
-        if sys.hexversion >= 0x3020000:
-            warnings.filterwarnings('ignore',category=ResourceWarning)
-
-    def tearDown(self):
-        sys.stderr = sys.__stderr__
-        sys.stdout = sys.__stdout__
+        capture_output(self)
+        warnings.filterwarnings('ignore',category=ResourceWarning)
+
     def test_lex_doc1(self):
         self.assertRaises(SyntaxError,run_import,"lex_doc1")
         result = sys.stderr.getvalue()
@@ -312,22 +263,10 @@ class LexErrorWarningTests(unittest.TestCase):
         self.assertTrue(check_expected(result,
                                     "Invalid literals specification. literals must be a sequence of characters\n"))
 
-import os
-import subprocess
-import shutil
-
 # Tests related to various build options associated with lexers
 class LexBuildOptionTests(unittest.TestCase):
     def setUp(self):
-        sys.stderr = StringIO.StringIO()
-        sys.stdout = StringIO.StringIO()
-    def tearDown(self):
-        sys.stderr = sys.__stderr__
-        sys.stdout = sys.__stdout__
-        try:
-            shutil.rmtree("lexdir")
-        except OSError:
-            pass
+        capture_output(self)
 
     def test_lex_module(self):
         run_import("lex_module")
@@ -365,15 +304,19 @@ class LexBuildOptionTests(unittest.TestCase):
                                     "(TOK561,'TOK561:',1,39)\n"
                                     "(TOK999,'TOK999:',1,47)\n"
                                     ))
-        
+
+    def test_lex_pickle(self):
+        run_import("lex_pickle")
+        result = sys.stdout.getvalue()
+        self.assertTrue(check_expected(result,
+                                    "(NUMBER,3,1,0)\n"
+                                    "(PLUS,'+',1,2)\n"
+                                    "(NUMBER,4,1,16)\n"))
+
 # Tests related to run-time behavior of lexers
 class LexRunTests(unittest.TestCase):
     def setUp(self):
-        sys.stderr = StringIO.StringIO()
-        sys.stdout = StringIO.StringIO()
-    def tearDown(self):
-        sys.stderr = sys.__stderr__
-        sys.stdout = sys.__stdout__
+        capture_output(self)
 
     def test_lex_hedit(self):
         run_import("lex_hedit")
@@ -1,98 +1,64 @@
 # testyacc.py
 
 import unittest
-try:
-    import StringIO
-except ImportError:
-    import io as StringIO
+import io
+import contextlib
 
 import sys
-import os
+import importlib
 import warnings
 import re
-import platform
 
 sys.tracebacklimit = 0
 
 import ply.yacc
 
-def make_pymodule_path(filename):
-    path = os.path.dirname(filename)
-    file = os.path.basename(filename)
-    mod, ext = os.path.splitext(file)
-
-    if sys.hexversion >= 0x3040000:
-        import importlib.util
-        fullpath = importlib.util.cache_from_source(filename, ext=='.pyc')
-    elif sys.hexversion >= 0x3020000:
-        import imp
-        modname = mod+"."+imp.get_tag()+ext
-        fullpath = os.path.join(path,'__pycache__',modname)
-    else:
-        fullpath = filename
-    return fullpath
-
-def pymodule_out_exists(filename):
-    return os.path.exists(make_pymodule_path(filename))
-
-def pymodule_out_remove(filename):
-    os.remove(make_pymodule_path(filename))
-
-def implementation():
-    if platform.system().startswith("Java"):
-        return "Jython"
-    elif hasattr(sys, "pypy_version_info"):
-        return "PyPy"
-    else:
-        return "CPython"
-
-# Check the output to see if it contains all of a set of expected output lines.
-# This alternate implementation looks weird, but is needed to properly handle
-# some variations in error message order that occurs due to dict hash table
-# randomization that was introduced in Python 3.3
+_state_pattern = re.compile(r' state \d+')
+
+# Check the output against a set of expected output lines.  Every line of
+# output, less any WARNING: or ERROR: prefix, must end with one of the
+# expected lines.  Order doesn't matter since some messages come out in a
+# different order from run to run.  Empty output passes.
 def check_expected(result, expected):
     # Normalize 'state n' text to account for randomization effects in Python 3.3
-    expected = re.sub(r' state \d+', 'state <n>', expected)
-    result = re.sub(r' state \d+', 'state <n>', result)
+    expected = _state_pattern.sub('state <n>', expected)
+    result = _state_pattern.sub('state <n>', result)
 
-    resultlines = set()
+    # Every line of output must end with one of the expected lines
+    expectedlines = tuple(expected.splitlines())
     for line in result.splitlines():
         if line.startswith("WARNING: "):
             line = line[9:]
         elif line.startswith("ERROR: "):
             line = line[7:]
-        resultlines.add(line)
-
-    # Selectively remove expected lines from the output
-    for eline in expected.splitlines():
-        resultlines = set(line for line in resultlines if not line.endswith(eline))
-
-    # Return True if no result lines remain
-    return not bool(resultlines)
+        if not line.endswith(expectedlines):
+            return False
+    return True
 
 def run_import(module):
-    code = "import "+module
-    exec(code)
-    del sys.modules[module]
+    try:
+        importlib.import_module(module)
+    finally:
+        sys.modules.pop(module, None)
+
+# Redirect sys.stdout and sys.stderr to fresh buffers for the duration of
+# a test.  The previous streams are restored when the test finishes.
+def capture_output(testcase):
+    stack = contextlib.ExitStack()
+    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+    stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+    testcase.addCleanup(stack.close)
     
 # Tests related to errors and warnings when building parsers
 class YaccErrorWarningTests(unittest.TestCase):
-    def setUp(self):
-        sys.stderr = StringIO.StringIO()
-        sys.stdout = StringIO.StringIO()
-        try:
-            os.remove("parsetab.py")
-            pymodule_out_remove("parsetab.pyc")
-        except OSError:
-            pass
-        
-        if sys.hexversion >= 0x3020000:
-            warnings.filterwarnings('ignore', category=ResourceWarning)
+    @classmethod
+    def setUpClass(cls):
+        warnings.filterwarnings('ignore', category=ResourceWarning)
         warnings.filterwarnings('ignore', category=DeprecationWarning)
 
-    def tearDown(self):
-        sys.stderr = sys.__stderr__
-        sys.stdout = sys.__stdout__
+    def setUp(self):
+        capture_output(self)
+
     def test_yacc_badargs(self):
         self.assertRaises(ply.yacc.YaccError,run_import,"yacc_badargs")
         result = sys.stderr.getvalue()
@@ -302,6 +268,14 @@ class YaccErrorWarningTests(unittest.TestCase):
             self.assertTrue(check_expected(result,
                                         "No token list is defined\n"))
 
+    def test_yacc_pickle(self):
+        run_import("yacc_pickle")
+        result = sys.stdout.getvalue()
+        self.assertEqual(result,
+                         "7\n"
+                         "23\n"
+                         "-10\n")
+
     def test_yacc_rr(self):
         run_import("yacc_rr")
         result = sys.stderr.getvalue()
@@ -0,0 +1,62 @@
+# -----------------------------------------------------------------------------
+# yacc_pickle.py
+#
+# Make sure a parser survives a round trip through pickle after it has
+# been used to parse some input.  The state of the last parse is not saved.
+# -----------------------------------------------------------------------------
+import pickle
+import ply.yacc as yacc
+
+from calclex import tokens, lexer
+
+# Parsing rules
+precedence = (
+    ('left','PLUS','MINUS'),
+    ('left','TIMES','DIVIDE'),
+    ('right','UMINUS'),
+    )
+
+def p_statement_expr(t):
+    'statement : expression'
+    print(t[1])
+    # Leave something that can't be pickled on the symbol stack.  It must
+    # not be saved along with the parser.
+    t[0] = (v for v in [t[1]])
+
+def p_expression_binop(t):
+    '''expression : expression PLUS expression
+                  | expression MINUS expression
+                  | expression TIMES expression
+                  | expression DIVIDE expression'''
+    if t[2] == '+'  : t[0] = t[1] + t[3]
+    elif t[2] == '-': t[0] = t[1] - t[3]
+    elif t[2] == '*': t[0] = t[1] * t[3]
+    elif t[2] == '/': t[0] = t[1] / t[3]
+
+def p_expression_uminus(t):
+    'expression : MINUS expression %prec UMINUS'
+    t[0] = -t[2]
+
+def p_expression_group(t):
+    'expression : LPAREN expression RPAREN'
+    t[0] = t[2]
+
+def p_expression_number(t):
+    'expression : NUMBER'
+    t[0] = t[1]
+
+def p_error(t):
+    print("Syntax error at '%s'" % t.value)
+
+parser = yacc.yacc()
+
+# The LR items are only needed to build the tables
+for p in parser.productions:
+    if p.lr_items or p.lr_next is not None:
+        print("LR items kept for %s" % p)
+
+parser.parse("3+4", lexer=lexer)
+
+parser = pickle.loads(pickle.dumps(parser))
+parser.parse("3+4*5", lexer=lexer)
+parser.parse("-(2+3)*2", lexer=lexer)